@@ -1,6 +1,7 @@
 import sys
 import os
 import datetime
+import random
 import pygame
 import chess
 from pygame import Rect
@@ -25,6 +26,11 @@ RING    = (20, 20, 20)      # capture target ring
 
 FILES = "abcdefgh"
 RANKS = "12345678"
+FILES_REV = FILES[::-1]
+RANKS_REV = RANKS[::-1]
+# Label characters in screen order (left->right, top->bottom), indexed by flipped
+FILE_CHARS = (FILES, FILES_REV)
+RANK_CHARS = (RANKS_REV, RANKS)
 
 GLYPHS = {
     chess.KING:   ('♔', '♚'),
@@ -50,6 +56,101 @@ BOARD_PIX = BOARD_SIZE * SQUARE_SIZE
 WIN_W = OUTER_MARGIN*2 + BOARD_PIX
 WIN_H = OUTER_MARGIN*2 + LABEL_GAP + BOARD_PIX
 
+# ---------------------------- Board ----------------------------
+
+# Zobrist keys: one per (square, piece), castling-rights bit, en passant square and side to move
+_zrng = random.Random(0)
+ZOBRIST_PIECES = [[_zrng.getrandbits(64) for _ in range(12)] for _ in chess.SQUARES]
+ZOBRIST_CASTLING = [_zrng.getrandbits(64) for _ in chess.SQUARES]
+ZOBRIST_EP = [_zrng.getrandbits(64) for _ in chess.SQUARES]
+ZOBRIST_TURN = _zrng.getrandbits(64)
+
+def _square_zobrist(bitboards, sq: int) -> int:
+    """Zobrist key of whatever occupies sq in a (pawns..kings, white) bitboard tuple, 0 if empty."""
+    mask = chess.BB_SQUARES[sq]
+    for i, bb in enumerate(bitboards[:6]):
+        if bb & mask:
+            return ZOBRIST_PIECES[sq][i if bitboards[6] & mask else i + 6]
+    return 0
+
+class ZobristBoard(chess.Board):
+    """chess.Board that keeps a 64-bit Zobrist key of the position in ``_zkey``.
+
+    push() updates the key incrementally from the squares that changed, pop()
+    restores the previous key, and reset/set_fen/set_piece_at/... (anything
+    that clears the move stack), apply_transform, apply_mirror and root()
+    recompute it from scratch. Assigning ``turn``, ``castling_rights`` or
+    ``ep_square`` directly is not tracked.
+    """
+
+    def _bitboards(self):
+        return (self.pawns, self.knights, self.bishops, self.rooks, self.queens, self.kings,
+                self.occupied_co[chess.WHITE])
+
+    def _full_zobrist(self) -> int:
+        bitboards = self._bitboards()
+        key = 0
+        for sq in chess.scan_forward(self.occupied):
+            key ^= _square_zobrist(bitboards, sq)
+        for sq in chess.scan_forward(self.castling_rights):
+            key ^= ZOBRIST_CASTLING[sq]
+        if self.ep_square is not None:
+            key ^= ZOBRIST_EP[self.ep_square]
+        if self.turn == chess.BLACK:
+            key ^= ZOBRIST_TURN
+        return key
+
+    def clear_stack(self) -> None:
+        super().clear_stack()
+        self._zstack = []
+        self._zkey = self._full_zobrist()
+
+    def push(self, move: chess.Move) -> None:
+        before = self._bitboards()
+        castling, ep = self.castling_rights, self.ep_square
+        super().push(move)
+        after = self._bitboards()
+
+        key = self._zkey ^ ZOBRIST_TURN
+        changed = 0
+        for b, a in zip(before, after):
+            changed |= b ^ a
+        for sq in chess.scan_forward(changed):
+            key ^= _square_zobrist(before, sq) ^ _square_zobrist(after, sq)
+        for sq in chess.scan_forward(castling ^ self.castling_rights):
+            key ^= ZOBRIST_CASTLING[sq]
+        if ep is not None:
+            key ^= ZOBRIST_EP[ep]
+        if self.ep_square is not None:
+            key ^= ZOBRIST_EP[self.ep_square]
+
+        self._zstack.append(self._zkey)
+        self._zkey = key
+
+    def pop(self) -> chess.Move:
+        move = super().pop()
+        self._zkey = self._zstack.pop()
+        return move
+
+    def apply_transform(self, f) -> None:
+        super().apply_transform(f)
+        self._zkey = self._full_zobrist()   # ep square and castling rights move after clear_stack()
+
+    def apply_mirror(self) -> None:
+        super().apply_mirror()
+        self._zkey = self._full_zobrist()   # colors are swapped and turn flipped after apply_transform()
+
+    def root(self):
+        board = super().root()
+        board._zkey = board._full_zobrist()  # _BoardState.restore() bypasses clear_stack()
+        return board
+
+    def copy(self, *, stack=True):
+        board = super().copy(stack=stack)
+        board._zkey = self._zkey
+        board._zstack = self._zstack[-len(board.move_stack):] if board.move_stack else []
+        return board
+
 # ---------------------------- Utility ----------------------------
 
 def find_font(px: int) -> pygame.font.Font:
@@ -85,32 +186,66 @@ def display_to_model(r: int, c: int, flipped: bool):
         rank = r
     return chess.square(file, rank)
 
+def _square_xy(sq: int, flipped: bool):
+    r, c = model_to_display(sq, flipped)
+    return OUTER_MARGIN + c*SQUARE_SIZE, OUTER_MARGIN + r*SQUARE_SIZE
+
+# SQ_TO_XY[flipped][sq] -> (x, y): top-left pixel of a square
+SQ_TO_XY = [[_square_xy(sq, flipped) for sq in chess.SQUARES] for flipped in (False, True)]
+
 def square_at_pixel(pos):
     """Mouse pixel -> (row, col) grid or None if outside board."""
-    x, y = pos
-    bx = x - OUTER_MARGIN
-    by = y - OUTER_MARGIN
+    bx = pos[0] - OUTER_MARGIN
+    by = pos[1] - OUTER_MARGIN
     if 0 <= bx < BOARD_PIX and 0 <= by < BOARD_PIX:
-        col = bx // SQUARE_SIZE
-        row = by // SQUARE_SIZE
-        return int(row), int(col)
+        return by // SQUARE_SIZE, bx // SQUARE_SIZE
     return None
 
-def legal_moves_from(board: chess.Board, src: int):
-    """Return list of legal moves from src square."""
-    return [m for m in board.legal_moves if m.from_square == src]
+# Legal moves (and the checked king's square) of the last seen position
+_move_cache = {'key': None, 'dst_by_src': {}, 'check_sq': None}
+
+def _ensure_cache(board: chess.Board):
+    """Return the move cache for board, regenerating it only when the position changed.
+
+    ``dst_by_src[src][dst]`` lists the legal moves from src landing on dst
+    (several only for promotions); ``check_sq`` is the king of the side to
+    move if it is in check, else None.
+    """
+    # Both keys cover pieces, side to move, castling rights and en passant --
+    # everything the legal move list depends on. ZobristBoard keeps its key up
+    # to date on push/pop, so no per-call hashing is needed.
+    key = board._zkey if isinstance(board, ZobristBoard) else board._transposition_key()
+    if key != _move_cache['key']:
+        dst_by_src = {}
+        for m in board.legal_moves:
+            dst_by_src.setdefault(m.from_square, {}).setdefault(m.to_square, []).append(m)
+        _move_cache['key'] = key
+        _move_cache['dst_by_src'] = dst_by_src
+        _move_cache['check_sq'] = board.king(board.turn) if board.is_check() else None
+    return _move_cache
+
+def legal_targets_from(board: chess.Board, src: int):
+    """Return {dst: [moves]} for the legal moves from src square."""
+    return _ensure_cache(board)['dst_by_src'].get(src, {})
+
+def check_square(board: chess.Board):
+    """Square of the side-to-move king if it is in check, else None."""
+    return _ensure_cache(board)['check_sq']
 
 def move_for(board: chess.Board, src: int, dst: int, promotion: int | None = None):
     """Find a legal move object matching src->dst (and promotion if necessary)."""
-    for m in board.legal_moves:
-        if m.from_square == src and m.to_square == dst:
-            if chess.Move.from_uci(m.uci()).promotion == promotion or m.promotion == promotion:
-                return m
+    for m in legal_targets_from(board, src).get(dst, ()):
+        if m.promotion == promotion:
+            return m
     return None
 
-def needs_promotion(board: chess.Board, src: int, dst: int) -> bool:
-    """Check if moving from src to dst would require a promotion (pawn reaching last rank)."""
-    piece = board.piece_at(src)
+def needs_promotion(board: chess.Board, src: int, dst: int, piece: chess.Piece | None = None) -> bool:
+    """Check if moving from src to dst would require a promotion (pawn reaching last rank).
+
+    Pass the piece on src if it is already known to skip the board lookup.
+    """
+    if piece is None:
+        piece = board.piece_at(src)
     if piece is None or piece.piece_type != chess.PAWN:
         return False
     rank = chess.square_rank(dst)
@@ -125,7 +260,21 @@ def save_screenshot(screen: pygame.Surface):
 
 # ---------------------------- Drawing ----------------------------
 
-def draw_board(surface, label_font, flipped, last_move=None, check_sq=None):
+LABEL_SURFS = [None, None]  # LABEL_SURFS[flipped][axis][i], axis 0 = files (bottom), 1 = ranks (left)
+
+def _build_label_surfaces(label_font):
+    """Render the 16 coordinate labels once and index them by orientation."""
+    files = {ch: label_font.render(ch, True, (230, 230, 230)).convert_alpha() for ch in FILES}
+    ranks = {ch: label_font.render(ch, True, (230, 230, 230)).convert_alpha() for ch in RANKS}
+    for flipped in (False, True):
+        LABEL_SURFS[flipped] = ([files[ch] for ch in FILE_CHARS[flipped]],
+                                [ranks[ch] for ch in RANK_CHARS[flipped]])
+
+_board_cache = {}   # flipped -> pre-rendered background (frame, squares, labels)
+
+def _build_board_surface(flipped):
+    """Render the static parts of the board (everything but highlights) once."""
+    surface = pygame.Surface((WIN_W, WIN_H))
     surface.fill(BG)
 
     # Frame
@@ -139,99 +288,140 @@ def draw_board(surface, label_font, flipped, last_move=None, check_sq=None):
             rect = Rect(OUTER_MARGIN + c*SQUARE_SIZE, OUTER_MARGIN + r*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
             pygame.draw.rect(surface, color, rect, border_radius=10)
 
-    # Last move highlight
-    if last_move:
-        for sq in (last_move.from_square, last_move.to_square):
-            rr, cc = model_to_display(sq, flipped)
-            rect = Rect(OUTER_MARGIN + cc*SQUARE_SIZE, OUTER_MARGIN + rr*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
-            s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-            s.fill((*LASTMV, 90))
-            surface.blit(s, rect.topleft)
-
-    # Check square highlight
-    if check_sq is not None:
-        rr, cc = model_to_display(check_sq, flipped)
-        rect = Rect(OUTER_MARGIN + cc*SQUARE_SIZE, OUTER_MARGIN + rr*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
-        s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-        s.fill((*CHECK, 110))
-        surface.blit(s, rect.topleft)
-
-    # File labels (bottom)
-    for i in range(8):
-        file_char = FILES[::-1][i] if flipped else FILES[i]
-        label = label_font.render(file_char, True, (230, 230, 230))
+    # File labels (bottom) and rank labels (left)
+    file_labels, rank_labels = LABEL_SURFS[flipped]
+    seq = []
+    for i, label in enumerate(file_labels):
         lx = OUTER_MARGIN + i*SQUARE_SIZE + SQUARE_SIZE//2 - label.get_width()//2
         ly = OUTER_MARGIN + BOARD_PIX + 6
-        surface.blit(label, (lx, ly))
-
-    # Rank labels (left)
-    for i in range(8):
-        rank_char = RANKS[i] if flipped else RANKS[::-1][i]
-        label = label_font.render(rank_char, True, (230, 230, 230))
+        seq.append((label, (lx, ly)))
+    for i, label in enumerate(rank_labels):
         lx = OUTER_MARGIN - 12 - label.get_width()
         ly = OUTER_MARGIN + i*SQUARE_SIZE + SQUARE_SIZE//2 - label.get_height()//2
-        surface.blit(label, (lx, ly))
+        seq.append((label, (lx, ly)))
+    blit_batch(surface, seq)
+
+    return surface.convert()
+
+_HAS_FBLITS = hasattr(pygame.Surface, 'fblits')   # pygame-ce only
+
+def blit_batch(surface, seq):
+    """Blit a list of (source, dest) pairs in one call (fblits where available)."""
+    if _HAS_FBLITS:
+        surface.fblits(seq)
+    else:
+        surface.blits(seq, doreturn=False)
 
-def draw_pieces(surface, board: chess.Board, piece_font, flipped, skip_sq=None, drag_pos=None, glyph_shadow=True):
+HIGHLIGHT_SURFS = {}  # 'lastmove' / 'check' / 'select' -> translucent square overlay
+
+def _build_highlight_surfaces():
+    """Create the translucent square overlays once instead of per frame."""
+    for name, rgba in (('lastmove', (*LASTMV, 90)), ('check', (*CHECK, 110)), ('select', (*HILITE, 80))):
+        s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+        s.fill(rgba)
+        HIGHLIGHT_SURFS[name] = s.convert_alpha()
+
+def draw_board(surface, flipped, last_move=None, check_sq=None, selected_sq=None):
+    background = _board_cache.get(flipped)
+    if background is None:
+        background = _board_cache[flipped] = _build_board_surface(flipped)
+    surface.blit(background, (0, 0))
+
+    # Highlights (last move, check, selection) in a single batch
+    seq = []
+    if last_move:
+        for sq in (last_move.from_square, last_move.to_square):
+            seq.append((HIGHLIGHT_SURFS['lastmove'], SQ_TO_XY[flipped][sq]))
+    if check_sq is not None:
+        seq.append((HIGHLIGHT_SURFS['check'], SQ_TO_XY[flipped][check_sq]))
+    if selected_sq is not None:
+        seq.append((HIGHLIGHT_SURFS['select'], SQ_TO_XY[flipped][selected_sq]))
+    if seq:
+        blit_batch(surface, seq)
+
+PIECE_SPRITES = {}  # (piece_type, color) -> pre-rendered glyph with baked shadow
+
+def _build_piece_sprites(piece_font):
+    """Render each of the 12 piece glyphs once, centered in a square-sized sprite."""
+    for ptype, (white_glyph, black_glyph) in GLYPHS.items():
+        for color, glyph in ((chess.WHITE, white_glyph), (chess.BLACK, black_glyph)):
+            sprite = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+            shadow = piece_font.render(glyph, True, (0, 0, 0))
+            sprite.blit(shadow, (SQUARE_SIZE//2 - shadow.get_width()//2 + 3,
+                                 SQUARE_SIZE//2 - shadow.get_height()//2 + 3))
+            fill = piece_font.render(glyph, True, (255, 255, 255))
+            sprite.blit(fill, (SQUARE_SIZE//2 - fill.get_width()//2,
+                               SQUARE_SIZE//2 - fill.get_height()//2))
+            PIECE_SPRITES[(ptype, color)] = sprite.convert_alpha()
+
+def draw_pieces(surface, board: chess.Board, flipped, skip_sq=None, drag_pos=None):
     """Draw all pieces; optionally skip a square (the one being dragged) and draw it at drag_pos."""
-    for sq in chess.SQUARES:
-        if sq == skip_sq:
-            continue
-        piece = board.piece_at(sq)
-        if not piece:
-            continue
-        draw_piece_on_sq(surface, piece, sq, piece_font, flipped, glyph_shadow)
+    xy = SQ_TO_XY[flipped]
+    blit_batch(surface, [(PIECE_SPRITES[(piece.piece_type, piece.color)], xy[sq])
+                         for sq, piece in board.piece_map().items() if sq != skip_sq])
 
     # Dragged piece on top
     if skip_sq is not None and drag_pos is not None:
         piece = board.piece_at(skip_sq)
         if piece:
-            draw_piece_at(surface, piece, drag_pos, piece_font, glyph_shadow)
+            draw_piece_at(surface, piece, drag_pos)
 
-def draw_piece_on_sq(surface, piece: chess.Piece, sq: int, piece_font, flipped, glyph_shadow=True):
-    r, c = model_to_display(sq, flipped)
-    cx = OUTER_MARGIN + c*SQUARE_SIZE + SQUARE_SIZE//2
-    cy = OUTER_MARGIN + r*SQUARE_SIZE + SQUARE_SIZE//2
-    draw_glyph(surface, piece, (cx, cy), piece_font, glyph_shadow)
-
-def draw_piece_at(surface, piece: chess.Piece, pos_xy, piece_font, glyph_shadow=True):
+def draw_piece_at(surface, piece: chess.Piece, pos_xy):
     cx, cy = pos_xy
-    draw_glyph(surface, piece, (cx, cy), piece_font, glyph_shadow)
-
-def draw_glyph(surface, piece: chess.Piece, center_xy, piece_font, glyph_shadow=True):
-    white = piece.color
-    glyph = GLYPHS[piece.piece_type][0 if white else 1]
-    # Slight outline/shadow
-    if glyph_shadow:
-        surf_shadow = piece_font.render(glyph, True, (0, 0, 0))
-        surface.blit(surf_shadow, (center_xy[0] - surf_shadow.get_width()//2 + 3,
-                                   center_xy[1] - surf_shadow.get_height()//2 + 3))
-    surf = piece_font.render(glyph, True, (255, 255, 255))
-    surface.blit(surf, (center_xy[0] - surf.get_width()//2,
-                        center_xy[1] - surf.get_height()//2))
-
-def draw_move_hints(surface, board: chess.Board, src: int, legal_from_src, flipped):
-    """Draw dots/rings for legal targets from src."""
-    for m in legal_from_src:
-        rr, cc = model_to_display(m.to_square, flipped)
-        rect = Rect(OUTER_MARGIN + cc*SQUARE_SIZE, OUTER_MARGIN + rr*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
-        target_piece = board.piece_at(m.to_square)
-        cx = rect.centerx
-        cy = rect.centery
-        if target_piece is None:
-            # Dot for empty target
-            pygame.draw.circle(surface, DOT, (cx, cy), SQUARE_SIZE//10)
-        else:
-            # Ring for capture
-            pygame.draw.circle(surface, RING, (cx, cy), SQUARE_SIZE//2 - 8, width=6)
+    draw_glyph(surface, piece, (cx, cy))
+
+def draw_glyph(surface, piece: chess.Piece, center_xy):
+    surface.blit(PIECE_SPRITES[(piece.piece_type, piece.color)],
+                 (center_xy[0] - SQUARE_SIZE//2, center_xy[1] - SQUARE_SIZE//2))
+
+HINT_SURFS = {}  # 'dot' (empty target, tight bounding box) / 'ring' (capture, square-sized) -> move hint
+
+DOT_RADIUS = SQUARE_SIZE//10
+# DOT_XY[flipped][sq] -> top-left of the dot sprite so it sits centered in the square
+_dot_offset = SQUARE_SIZE//2 - DOT_RADIUS
+DOT_XY = [[(x + _dot_offset, y + _dot_offset) for x, y in row] for row in SQ_TO_XY]
+
+def _build_hint_surfaces():
+    """Draw the move-hint dot and ring once so hints can be batch-blitted."""
+    dot = pygame.Surface((2*DOT_RADIUS + 1, 2*DOT_RADIUS + 1), pygame.SRCALPHA)
+    pygame.draw.circle(dot, DOT, (DOT_RADIUS, DOT_RADIUS), DOT_RADIUS)
+    ring = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+    pygame.draw.circle(ring, RING, (SQUARE_SIZE//2, SQUARE_SIZE//2), SQUARE_SIZE//2 - 8, width=6)
+    HINT_SURFS['dot'] = dot.convert_alpha()
+    HINT_SURFS['ring'] = ring.convert_alpha()
+
+def draw_move_hints(surface, board: chess.Board, src: int, targets, flipped):
+    """Draw dots/rings for legal targets from src (``targets`` is keyed by target square)."""
+    xy, dot_xy = SQ_TO_XY[flipped], DOT_XY[flipped]
+    dot, ring = HINT_SURFS['dot'], HINT_SURFS['ring']
+    blit_batch(surface, [(dot, dot_xy[dst]) if board.piece_at(dst) is None else (ring, xy[dst])
+                         for dst in targets])
+
+def _promotion_panel():
+    panel_w = SQUARE_SIZE*4 + 48
+    panel_h = SQUARE_SIZE + 64
+    return Rect((WIN_W - panel_w)//2, (WIN_H - panel_h)//2, panel_w, panel_h)
+
+def _promotion_boxes():
+    """Click targets of the promotion overlay as (rect, piece_type); pure geometry, no drawing."""
+    panel = _promotion_panel()
+    pieces = [chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT]
+    return [(Rect(panel.left + 24 + i*(SQUARE_SIZE + 16), panel.top + 36, SQUARE_SIZE, SQUARE_SIZE), ptype)
+            for i, ptype in enumerate(pieces)]
+
+_promotion_cache = {}  # white_to_move -> overlay surface
 
 def draw_promotion_overlay(surface, piece_font, label_font, white_to_move: bool):
     """Simple centered overlay to choose promotion piece by click or key."""
+    overlay = _promotion_cache.get(white_to_move)
+    if overlay is None:
+        overlay = _promotion_cache[white_to_move] = _build_promotion_overlay(piece_font, label_font, white_to_move)
+    surface.blit(overlay, (0, 0))
+
+def _build_promotion_overlay(piece_font, label_font, white_to_move: bool):
     overlay = pygame.Surface((WIN_W, WIN_H), pygame.SRCALPHA)
     overlay.fill((10, 10, 10, 170))
-    panel_w = SQUARE_SIZE*4 + 48
-    panel_h = SQUARE_SIZE + 64
-    panel = Rect((WIN_W - panel_w)//2, (WIN_H - panel_h)//2, panel_w, panel_h)
+    panel = _promotion_panel()
     pygame.draw.rect(overlay, (230, 230, 230), panel, border_radius=14)
 
     # Title
@@ -239,13 +429,9 @@ def draw_promotion_overlay(surface, piece_font, label_font, white_to_move: bool)
     overlay.blit(title, (panel.centerx - title.get_width()//2, panel.top + 10))
 
     # Four piece boxes
-    pieces = [chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT]
-    boxes = []
-    for i, ptype in enumerate(pieces):
-        x = panel.left + 24 + i*(SQUARE_SIZE + 16)
-        y = panel.top + 36
-        rect = Rect(x, y, SQUARE_SIZE, SQUARE_SIZE)
+    for rect, ptype in _promotion_boxes():
         pygame.draw.rect(overlay, (245, 245, 245), rect, border_radius=10)
+        # Rendered once per cached overlay, keeping the panel's 2px shadow
         glyph = GLYPHS[ptype][0 if white_to_move else 1]
         glyph_surf = piece_font.render(glyph, True, (0,0,0))
         overlay.blit(glyph_surf, (rect.centerx - glyph_surf.get_width()//2 + 2,
@@ -253,10 +439,8 @@ def draw_promotion_overlay(surface, piece_font, label_font, white_to_move: bool)
         glyph_surf2 = piece_font.render(glyph, True, (255,255,255))
         overlay.blit(glyph_surf2, (rect.centerx - glyph_surf2.get_width()//2,
                                    rect.centery - glyph_surf2.get_height()//2))
-        boxes.append((rect, ptype))
 
-    surface.blit(overlay, (0, 0))
-    return boxes  # list of (rect, piece_type)
+    return overlay.convert_alpha()
 
 # ---------------------------- Main ----------------------------
 
@@ -268,8 +452,12 @@ def main():
     # Fonts
     piece_font = find_font(int(SQUARE_SIZE * 0.80))
     label_font = find_font(22)
+    _build_label_surfaces(label_font)
+    _build_piece_sprites(piece_font)
+    _build_highlight_surfaces()
+    _build_hint_surfaces()
 
-    board = chess.Board()
+    board = ZobristBoard()
     flipped = False
     show_hints = True
 
@@ -277,7 +465,8 @@ def main():
         'active': False,     # currently dragging
         'sq': None,          # source square
         'pos': (0, 0),       # current mouse pos
-        'moves': [],         # legal moves from source
+        'moves': {},         # legal moves from source, keyed by target square
+        'piece': None,       # piece picked up from source
     }
 
     promotion_state = {
@@ -288,23 +477,23 @@ def main():
 
     clock = pygame.time.Clock()
     running = True
+    needs_redraw = True       # something visible changed since the last frame
+    dirty = True              # ...and it is not confined to the dragged piece
+    prev_drag_rect = None     # where the dragged piece was last presented
 
     while running:
         clock.tick(60)
-        last_move = board.peek() if board.move_stack else None
-        check_sq = None
-        if board.is_check():
-            # side to move is in check
-            king_sq = board.king(board.turn)
-            if king_sq is not None:
-                check_sq = king_sq
 
         # Events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
+            elif event.type == pygame.WINDOWEXPOSED:
+                needs_redraw = dirty = True
+
             elif event.type == pygame.KEYDOWN:
+                needs_redraw = dirty = True
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 elif event.key == pygame.K_f:
@@ -335,6 +524,7 @@ def main():
                         promotion_state.update({'pending': False, 'src': None, 'dst': None})
 
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not promotion_state['pending']:
+                needs_redraw = dirty = True
                 grid = square_at_pixel(event.pos)
                 if grid:
                     r, c = grid
@@ -346,12 +536,15 @@ def main():
                         dragging['active'] = True
                         dragging['sq'] = sq
                         dragging['pos'] = event.pos
-                        dragging['moves'] = legal_moves_from(board, sq)
+                        dragging['moves'] = legal_targets_from(board, sq)
+                        dragging['piece'] = piece
 
             elif event.type == pygame.MOUSEMOTION and dragging['active']:
                 dragging['pos'] = event.pos
+                needs_redraw = True
 
             elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                needs_redraw = dirty = True
                 if dragging['active'] and not promotion_state['pending']:
                     grid = square_at_pixel(event.pos)
                     src = dragging['sq']
@@ -359,9 +552,9 @@ def main():
                         r, c = grid
                         dst = display_to_model(r, c, flipped)
                         # Handle promotions
-                        if needs_promotion(board, src, dst):
+                        if needs_promotion(board, src, dst, dragging['piece']):
                             # Offer dialog (only if some promotion move is legal)
-                            possible = any(m.from_square == src and m.to_square == dst and m.promotion for m in board.legal_moves)
+                            possible = any(m.promotion for m in legal_targets_from(board, src).get(dst, ()))
                             if possible:
                                 promotion_state.update({'pending': True, 'src': src, 'dst': dst})
                             else:
@@ -375,14 +568,15 @@ def main():
                     dragging['active'] = False
                     dragging['sq'] = None
                     dragging['pos'] = (0, 0)
-                    dragging['moves'] = []
+                    dragging['moves'] = {}
+                    dragging['piece'] = None
 
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and promotion_state['pending']:
                 # Click on promotion panel
-                boxes = draw_promotion_overlay(screen, piece_font, label_font, board.turn)
+                needs_redraw = dirty = True
                 # detect clicks
                 mouse = pygame.mouse.get_pos()
-                for rect, ptype in boxes:
+                for rect, ptype in _promotion_boxes():
                     if rect.collidepoint(mouse):
                         src, dst = promotion_state['src'], promotion_state['dst']
                         m = move_for(board, src, dst, promotion=ptype)
@@ -392,15 +586,26 @@ def main():
                         break
 
         # ---------- Rendering ----------
-        draw_board(screen, label_font, flipped, last_move=last_move, check_sq=check_sq)
+        # Nothing changed: keep the last presented frame
+        if not needs_redraw:
+            continue
+
+        # While only the dragged piece moves, redraw just the area covering its old
+        # and new bounding boxes (SDL clips every blit) and present those two rects;
+        # any other change redraws and flips the whole window.
+        cur_drag_rect = None
+        if dragging['active']:
+            cur_drag_rect = Rect(0, 0, SQUARE_SIZE, SQUARE_SIZE)
+            cur_drag_rect.center = dragging['pos']
+        partial = not dirty and prev_drag_rect is not None and cur_drag_rect is not None
+        if partial:
+            screen.set_clip(prev_drag_rect.union(cur_drag_rect))
 
-        # Selected/drag square highlight
-        if dragging['active'] and dragging['sq'] is not None:
-            rr, cc = model_to_display(dragging['sq'], flipped)
-            rect = Rect(OUTER_MARGIN + cc*SQUARE_SIZE, OUTER_MARGIN + rr*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
-            s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-            s.fill((*HILITE, 80))
-            screen.blit(s, rect.topleft)
+        last_move = board.peek() if board.move_stack else None
+        check_sq = check_square(board)
+
+        selected_sq = dragging['sq'] if dragging['active'] else None
+        draw_board(screen, flipped, last_move=last_move, check_sq=check_sq, selected_sq=selected_sq)
 
         # Move hints
         if show_hints and dragging['active'] and dragging['moves']:
@@ -409,13 +614,19 @@ def main():
         # Pieces (skip dragged square and draw that glyph at cursor)
         skip = dragging['sq'] if dragging['active'] else None
         drag_xy = dragging['pos'] if dragging['active'] else None
-        draw_pieces(screen, board, piece_font, flipped, skip_sq=skip, drag_pos=drag_xy)
+        draw_pieces(screen, board, flipped, skip_sq=skip, drag_pos=drag_xy)
 
         # Promotion overlay (draw on top, but don't block event loop visuals)
         if promotion_state['pending']:
             draw_promotion_overlay(screen, piece_font, label_font, board.turn)
 
-        pygame.display.flip()
+        if partial:
+            screen.set_clip(None)
+            pygame.display.update([prev_drag_rect, cur_drag_rect])
+        else:
+            pygame.display.flip()
+        prev_drag_rect = cur_drag_rect
+        needs_redraw = dirty = False
 
     pygame.quit()
 
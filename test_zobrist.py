@@ -0,0 +1,66 @@
+import random
+import unittest
+
+import chess
+
+from projectfileone import ZobristBoard, legal_targets_from
+
+
+class ZobristBoardTest(unittest.TestCase):
+    FENS = [
+        chess.STARTING_FEN,
+        "r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1",
+        "4k3/1P6/8/3pP3/8/8/6p1/4K3 w - d6 0 1",
+    ]
+
+    def assertKey(self, board):
+        self.assertEqual(board._zkey, board._full_zobrist(), board.fen())
+
+    def random_game(self, rng, fen):
+        board = ZobristBoard(fen)
+        for _ in range(rng.randint(1, 120)):
+            moves = list(board.legal_moves)
+            if board.move_stack and (not moves or rng.random() < 0.1):
+                board.pop()
+            elif moves:
+                board.push(rng.choice(moves))
+            else:
+                break
+            self.assertKey(board)
+        return board
+
+    def test_push_pop(self):
+        rng = random.Random(1)
+        for fen in self.FENS:
+            for _ in range(100):
+                board = self.random_game(rng, fen)
+                while board.move_stack:
+                    board.pop()
+                    self.assertKey(board)
+
+    def test_derived_boards(self):
+        rng = random.Random(2)
+        for fen in self.FENS:
+            for _ in range(50):
+                board = self.random_game(rng, fen)
+                for derived in (board.copy(), board.copy(stack=3), board.copy(stack=False), board.root(),
+                                board.mirror(), board.transform(chess.flip_horizontal),
+                                board.transform(chess.flip_vertical)):
+                    self.assertKey(derived)
+                    while derived.move_stack:
+                        derived.pop()
+                        self.assertKey(derived)
+                board.apply_mirror()
+                self.assertKey(board)
+                board.reset()
+                self.assertEqual(board._zkey, ZobristBoard()._zkey)
+
+    def test_root_does_not_poison_move_cache(self):
+        board = ZobristBoard()
+        board.push_uci("e2e4")
+        self.assertTrue(legal_targets_from(board.root(), chess.E2))
+        self.assertFalse(legal_targets_from(ZobristBoard(None), chess.E2))
+
+
+if __name__ == "__main__":
+    unittest.main()